@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2016 - Piotr Skonieczka
+#
+
+import argparse
+from dopplerlib import observations_data
+
+
+def parse_command_line_arguments():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--observations", type=str, required=True, dest="observation_data_file")
+    parser.add_argument("--output", type=str, required=False, dest="output_file", default=None)
+
+    return parser.parse_args()
+
+
+def get_output_file_name(input_file_name):
+    return input_file_name.rsplit(".", 1)[0] + ".npy"
+
+
+def main(args):
+    print "* Reading observations..."
+    # Uncertainties are stored without the jitter correction (not supported for the binary files)
+    observations = observations_data.ObservationsData.load_data(args.observation_data_file, scale_to_the_jitter=False)
+
+    print "* Saving binary observations..."
+    output_file = args.output_file or get_output_file_name(args.observation_data_file)
+    observations.save_binary(output_file)
+
+    print "  Observations    :", observations.count
+    print "  Resulting file  :", output_file
+
+
+if __name__ == "__main__":
+    main(args=parse_command_line_arguments())
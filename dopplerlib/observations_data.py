@@ -6,20 +6,111 @@
 
 import numpy
 
+# Default number of observations processed at once for the memory-mapped data
+DEFAULT_CHUNK_SIZE = 65536
+
+# Record layout of the binary (memory-mappable) observations file
+OBSERVATIONS_RECORD_TYPE = numpy.dtype([
+    ("julian_times", numpy.float64),
+    ("radial_velocities", numpy.float64),
+    ("uncertainties", numpy.float64),
+    ("ids_of_telescopes", numpy.int64),
+])
+
 
 class ObservationsData:
-    def __init__(self, julian_times, radial_velocities, uncertainties, ids_of_telescopes):
+    def __init__(self, julian_times, radial_velocities, uncertainties, ids_of_telescopes, chunk_size=None):
         self.julian_times = julian_times
         self.radial_velocities = radial_velocities
         self.uncertainties = uncertainties
         self.ids_of_telescopes = ids_of_telescopes
+        # Number of observations processed at once (None means the whole data set)
+        self.chunk_size = chunk_size
+        # Reusable working arrays for the chunked calculations
+        self.scratch_buffers = None
         # Count the observations
         self.count = len(self.julian_times)
         # Count the instruments
-        self.telescopes_count = len(set(self.ids_of_telescopes))
+        self.telescopes_count = len(self.unique_telescopes())
 
     def reduce_offsets(self, offsets_array):
-        self.radial_velocities -= offsets_array
+        # Not in place: the memory-mapped observations are read-only
+        self.radial_velocities = self.radial_velocities - offsets_array
+
+    def chunks_ranges(self):
+        """
+        Split the observations into the blocks of the chunk_size length
+            :return: (generator) pairs of (start, stop) indexes
+        """
+        chunk_size = self.chunk_size or max(self.count, 1)
+        return ((start, min(start + chunk_size, self.count)) for start in xrange(0, self.count, chunk_size))
+
+    def get_scratch_buffers(self):
+        """
+        Get the working arrays of the chunk's length, reallocated only when the chunk_size has grown
+            :return: (tuple) two numpy.arrays
+        """
+        buffer_size = min(self.chunk_size or self.count, self.count)
+
+        if self.scratch_buffers is None or len(self.scratch_buffers[0]) < buffer_size:
+            self.scratch_buffers = (numpy.empty(buffer_size), numpy.empty(buffer_size))
+
+        return self.scratch_buffers
+
+    def unique_telescopes(self):
+        ids_of_telescopes = set()
+        for start, stop in self.chunks_ranges():
+            ids_of_telescopes.update(numpy.unique(self.ids_of_telescopes[start:stop]))
+
+        return ids_of_telescopes
+
+    def save_binary(self, file_name):
+        """
+        Store observations as a binary file which can be opened by the load_memory_mapped method
+            :param file_name: (str) name of the .npy file
+        """
+        records = numpy.lib.format.open_memmap(file_name, mode="w+", dtype=OBSERVATIONS_RECORD_TYPE,
+                                               shape=(self.count, ))
+
+        for start, stop in self.chunks_ranges():
+            for column_name in OBSERVATIONS_RECORD_TYPE.names:
+                records[column_name][start:stop] = getattr(self, column_name)[start:stop]
+
+        records.flush()
+        del records
+
+    @staticmethod
+    def load_observations(file_name, jitter_value=0.0, chunk_size=None):
+        """
+        Load observations from the text file (load_data) or open the binary .npy file (load_memory_mapped)
+            :param file_name: (str)
+            :param jitter_value: (float) jitter correction, not supported for the binary files
+            :param chunk_size: (int) number of observations processed at once (None means the default value)
+            :return: ObservationsData instance
+        """
+        if file_name.endswith(".npy"):
+            # The binary files are read-only and store the uncertainties without the jitter correction
+            assert not jitter_value, "The jitter correction is not supported for the binary observations files"
+            return ObservationsData.load_memory_mapped(file_name, chunk_size=chunk_size or DEFAULT_CHUNK_SIZE)
+
+        observations = ObservationsData.load_data(file_name, jitter_value=jitter_value)
+        observations.chunk_size = chunk_size
+
+        return observations
+
+    @staticmethod
+    def load_memory_mapped(file_name, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Open observations stored by the save_binary method without reading them into the memory
+            :param file_name: (str) name of the .npy file
+            :param chunk_size: (int) number of observations processed at once
+            :return: ObservationsData instance
+        """
+        records = numpy.load(file_name, mmap_mode="r")
+        assert records.dtype == OBSERVATIONS_RECORD_TYPE, "The file does not contains observations records"
+
+        return ObservationsData(*(records[column_name] for column_name in OBSERVATIONS_RECORD_TYPE.names),
+                                chunk_size=chunk_size)
 
     @staticmethod
     def load_data(file_name, sort_observations=True, scale_to_the_mean=False, convert_kmps_to_mps=False,
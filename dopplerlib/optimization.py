@@ -4,18 +4,25 @@
 # Copyright (c) 2016 - Piotr Skonieczka
 #
 
+import os
 import pickle
+import signal
 import numpy
 
 from problem_of_the_kepler import doppler_solver_for_n_planets
 from scipy.optimize import curve_fit
 from scipy.optimize import differential_evolution
+from scipy.optimize import minimize
+from scipy.optimize._differentialevolution import DifferentialEvolutionSolver
 
 
 class DopplerOptimizationModel:
     # Metadata
     observations_file = None
     stellar_jitter = None
+    # Resampling results
+    parameters_intervals = None
+    resampling_method = None
 
     def __init__(self, number_of_planets, number_of_telescopes, orbital_parameters=None, parameters_uncertainties=None):
         self.number_of_planets = number_of_planets
@@ -31,18 +38,28 @@ class DopplerOptimizationModel:
         self.observations_file = observations_file
         self.stellar_jitter = stellar_jitter
 
+    def add_parameters_intervals(self, parameters_intervals, resampling_method):
+        self.parameters_intervals = list(parameters_intervals)
+        self.resampling_method = resampling_method
+
     def get_orbital_parameters(self, planet_number):
         return self.orbital_parameters[planet_number * 5: (planet_number + 1) * 5]
 
     def get_orbital_uncertainties(self, planet_number):
         return self.parameters_uncertainties[planet_number * 5: (planet_number + 1) * 5]
 
+    def get_orbital_intervals(self, planet_number):
+        return self.parameters_intervals[planet_number * 5: (planet_number + 1) * 5]
+
     def get_offsets(self):
         return self.orbital_parameters[-self.number_of_telescopes:]
 
     def get_offsets_uncersainties(self):
         return self.parameters_uncertainties[-self.number_of_telescopes:]
 
+    def get_offsets_intervals(self):
+        return self.parameters_intervals[-self.number_of_telescopes:]
+
     def split(self):
         """
         Split the modeled signal by the indywidual planets
@@ -60,11 +77,32 @@ class DopplerOptimizationModel:
             :param observations: ObservationsData instance
             :return:
         """
-        # Calculate residues
-        residues = self.residues_array(observations)
-        # Calculate and
-        chi2_sum = sum((residues / observations.uncertainties) ** 2)
-        return chi2_sum / (observations.count - self.parameters_count - 1)
+        return self.chi2_sum(observations) / (observations.count - self.parameters_count - 1)
+
+    def chi2_sum(self, observations):
+        """
+        Sum of the squared, weighted residues calculated block by block (see ObservationsData.chunk_size)
+            :param observations: ObservationsData instance (in-memory or memory-mapped)
+            :return: (float)
+        """
+        offsets_list = numpy.asarray(self.get_offsets(), dtype=float)
+        residues_buffer, offsets_buffer = observations.get_scratch_buffers()
+        chi2_sum = 0.0
+
+        for start, stop in observations.chunks_ranges():
+            residues = residues_buffer[:stop - start]
+            offsets = offsets_buffer[:stop - start]
+
+            # Residues of the block: (model - observed + offset) / uncertainty
+            numpy.take(offsets_list, observations.ids_of_telescopes[start:stop], out=offsets)
+            numpy.subtract(self.radial_velocities(observations.julian_times[start:stop]),
+                           observations.radial_velocities[start:stop], out=residues)
+            residues += offsets
+            residues /= observations.uncertainties[start:stop]
+
+            chi2_sum += numpy.dot(residues, residues)
+
+        return chi2_sum
 
     def radial_velocities(self, time_range):
         return doppler_solver_for_n_planets(self.number_of_planets, time_range, self.orbital_parameters)
@@ -113,7 +151,7 @@ def optimization_ojective_function_builder(number_of_planets, number_of_telescop
     return {"rv": _multiplanetary_doppler_solver, "chi2": _multiplanetary_doppler_measurement}.get(mode)
 
 
-def evolutional_optimization(number_of_planets, number_of_telescopes, observations, population_size):
+def evolutional_optimization_bounds(number_of_planets, number_of_telescopes, observations):
     # Appoint the parameters ranges
     doppler_parameters_bouns = [
         (min(observations.julian_times), max(observations.julian_times)),  # time of perihelion passage
@@ -127,20 +165,143 @@ def evolutional_optimization(number_of_planets, number_of_telescopes, observatio
         (-25, 25),
     ] * number_of_telescopes
 
-    bounds_of_all_free_paramters = doppler_parameters_bouns + telescope_offsets_bounds
+    return doppler_parameters_bouns + telescope_offsets_bounds
+
+
+def evolutional_optimization(number_of_planets, number_of_telescopes, observations, population_size, seed=None,
+                             checkpoint_file=None, checkpoint_interval=10, resume=False):
+    """
+    Differential evolution search of the model's parameters
+        :param seed: (int) seed of the random generator (None means the random seed)
+        :param checkpoint_file: (str) file for the state of the optimization (None disables checkpoints)
+        :param checkpoint_interval: (int) number of generations between the checkpoints
+        :param resume: (boolean) continue the optimization from the existing checkpoint_file
+        :return: DopplerOptimizationModel instance
+    """
+    bounds_of_all_free_paramters = evolutional_optimization_bounds(number_of_planets, number_of_telescopes,
+                                                                   observations)
 
     # Build the objective function for the curve_fit algorithm
     doppler_function = \
         optimization_ojective_function_builder(number_of_planets, number_of_telescopes, observations, mode="chi2")
 
     # Start the differential_evolution optimization and get calculated paramters
-    optimal_orbital_paramters = \
-        differential_evolution(func=doppler_function, bounds=bounds_of_all_free_paramters, popsize=population_size).x
+    if checkpoint_file is None:
+        optimal_orbital_paramters = differential_evolution(func=doppler_function, bounds=bounds_of_all_free_paramters,
+                                                           popsize=population_size, seed=seed).x
+    else:
+        optimal_orbital_paramters = \
+            checkpointed_differential_evolution(doppler_function, bounds_of_all_free_paramters, population_size, seed,
+                                                checkpoint_file, checkpoint_interval, resume)
 
     # Return model
     return DopplerOptimizationModel(number_of_planets, number_of_telescopes, optimal_orbital_paramters)
 
 
+def save_checkpoint(checkpoint_file, checkpoint):
+    """
+    Atomic write of the checkpoint: the old file is replaced only by the completely written one
+        :param checkpoint_file: (str)
+        :param checkpoint: (dict) state of the optimization
+    """
+    temporary_file = checkpoint_file + ".tmp"
+
+    with open(temporary_file, "wb") as output_stream:
+        pickle.dump(checkpoint, output_stream, pickle.HIGHEST_PROTOCOL)
+        output_stream.flush()
+        os.fsync(output_stream.fileno())
+
+    os.rename(temporary_file, checkpoint_file)
+
+
+def read_checkpoint(checkpoint_file):
+    with open(checkpoint_file, "rb") as input_stream:
+        return pickle.load(input_stream)
+
+
+def checkpointed_differential_evolution(function, bounds, population_size, seed, checkpoint_file, checkpoint_interval,
+                                        resume, maximum_generations=1000):
+    """
+    Differential evolution evolved generation by generation with the periodic checkpoints of the population,
+    state of the random generator, best solution and the generation counter. SIGTERM makes the checkpoint
+    after the current generation and stops the optimization with KeyboardInterrupt.
+        :param function: objective function
+        :param bounds: (list) bounds of the parameters
+        :param population_size: (int) popsize of the differential_evolution
+        :param seed: (int) seed of the random generator (ignored when the optimization is resumed)
+        :param checkpoint_file: (str)
+        :param checkpoint_interval: (int) number of generations between the checkpoints
+        :param resume: (boolean) start from the checkpoint_file if exists
+        :param maximum_generations: (int)
+        :return: (numpy.array) optimal parameters
+    """
+    random_state = numpy.random.RandomState(seed)
+    solver = DifferentialEvolutionSolver(function, bounds, popsize=population_size, seed=random_state, polish=False)
+    generation, finished = 0, False
+
+    if resume and os.path.exists(checkpoint_file):
+        checkpoint = read_checkpoint(checkpoint_file)
+        assert checkpoint["bounds"] == list(bounds) and checkpoint["population"].shape == solver.population.shape, \
+            "The checkpoint does not match the optimization problem"
+
+        solver.population = checkpoint["population"]
+        solver.population_energies = checkpoint["population_energies"]
+        random_state.set_state(checkpoint["random_state"])
+        generation, finished = checkpoint["generation"], checkpoint["finished"]
+
+    def make_checkpoint():
+        save_checkpoint(checkpoint_file, {
+            "bounds": list(bounds),
+            "population": solver.population,
+            "population_energies": solver.population_energies,
+            "random_state": random_state.get_state(),
+            "generation": generation,
+            "finished": finished,
+            "best_solution": solver.x,
+            "best_energy": solver.population_energies[0],
+        })
+
+    # Stop at the end of the generation on SIGTERM (signals are available in the main thread only)
+    termination_requests = []
+    try:
+        previous_handler = signal.signal(signal.SIGTERM, lambda signal_number, frame: termination_requests.append(1))
+        handler_installed = True
+    except ValueError:
+        handler_installed = False
+
+    try:
+        while not finished and generation < maximum_generations:
+            try:
+                next(solver)
+                generation += 1
+            except StopIteration:
+                finished = True
+
+            energies = solver.population_energies
+            if numpy.all(numpy.isfinite(energies)) and \
+                    numpy.std(energies) <= solver.tol * numpy.abs(numpy.mean(energies)):
+                finished = True
+
+            if termination_requests:
+                make_checkpoint()
+                raise KeyboardInterrupt("Optimization terminated at generation %i" % generation)
+
+            if generation % checkpoint_interval == 0:
+                make_checkpoint()
+
+        finished = True
+        make_checkpoint()
+    finally:
+        if handler_installed:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+    # Polish the best solution like the differential_evolution does
+    best_solution, best_energy = solver.x, solver.population_energies[0]
+    polished_result = minimize(function, numpy.copy(best_solution), method="L-BFGS-B", bounds=bounds)
+
+    return polished_result.x if polished_result.fun < best_energy else best_solution
+
+
 def gradient_optimization(number_of_planets, number_of_telescopes, observations, initial_parameters):
     # Build the objective function for the curve_fit algorithm
     doppler_function = \
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2016 - Piotr Skonieczka
+#
+
+import numpy
+import multiprocessing
+
+from observations_data import ObservationsData
+from optimization import gradient_optimization
+
+
+# Observations and fitted model of the worker process (sent once per worker, see resampling_worker_initializer)
+_worker_state = dict()
+
+
+def bootstrap_residues_dataset(observations, fitted_values, random_state):
+    """
+    Build the synthetic data set: fitted model + residues drawn with replacement. The residues are standardized
+    (residue / uncertainty) and scaled back by the uncertainty of the target observation.
+        :param observations: ObservationsData instance
+        :param fitted_values: (numpy.array) radial velocities of the model including offsets of the telescopes
+        :param random_state: numpy.random.RandomState instance
+        :return: ObservationsData instance
+    """
+    standardized_residues = (observations.radial_velocities - fitted_values) / observations.uncertainties
+    resampled_residues = standardized_residues[random_state.randint(0, observations.count, observations.count)]
+
+    return ObservationsData(observations.julian_times, fitted_values + resampled_residues * observations.uncertainties,
+                            observations.uncertainties, observations.ids_of_telescopes, observations.chunk_size)
+
+
+def jackknife_dataset(observations, block_id, blocks_count):
+    """
+    Build the data set without one block of the observations (delete-d jackknife)
+        :param observations: ObservationsData instance
+        :param block_id: (int) index of the removed block (every blocks_count-th observation)
+        :param blocks_count: (int) number of the blocks
+        :return: ObservationsData instance
+    """
+    selected = numpy.ones(observations.count, dtype=bool)
+    selected[block_id::blocks_count] = False
+
+    return ObservationsData(observations.julian_times[selected], observations.radial_velocities[selected],
+                            observations.uncertainties[selected], observations.ids_of_telescopes[selected],
+                            observations.chunk_size)
+
+
+def resampling_worker_initializer(model, observations):
+    _worker_state["model"] = model
+    _worker_state["observations"] = observations
+    _worker_state["fitted_values"] = (model.radial_velocities(observations.julian_times) +
+                                      model.offsets_of_instruments(observations.ids_of_telescopes))
+
+
+def resampling_worker(task):
+    """
+    Refit the model to the single resampled data set
+        :param task: (tuple) method name, sample id, seed of the sample or number of the blocks
+        :return: (numpy.array) refitted parameters or None when the optimization has failed
+    """
+    method, sample_id, parameter = task
+    model, observations = _worker_state["model"], _worker_state["observations"]
+
+    if method == "bootstrap":
+        dataset = bootstrap_residues_dataset(observations, _worker_state["fitted_values"],
+                                             numpy.random.RandomState(parameter))
+    else:
+        dataset = jackknife_dataset(observations, sample_id, parameter)
+
+    # Warm start from the parameters of the parent model
+    try:
+        refitted_model = gradient_optimization(model.number_of_planets, model.number_of_telescopes, dataset,
+                                               model.orbital_parameters)
+    except RuntimeError:
+        return None
+
+    return numpy.array(refitted_model.orbital_parameters)
+
+
+def percentile_intervals(samples, method, confidence_level=68.27):
+    """
+    Aggregate the refitted parameters into the confidence intervals
+        :param samples: (numpy.array) samples_count x parameters_count array
+        :param method: (str) "bootstrap" or "jackknife"
+        :param confidence_level: (float) width of the interval in percents
+        :return: (list) pairs of (lower, upper) limits for each parameter
+    """
+    if method == "jackknife":
+        # Inflate the jackknife deviations to the scale of the sampling distribution
+        mean_values = numpy.mean(samples, axis=0)
+        samples = mean_values + numpy.sqrt(len(samples) - 1) * (samples - mean_values)
+
+    lower_limits, upper_limits = numpy.percentile(samples, [50 - confidence_level / 2, 50 + confidence_level / 2],
+                                                  axis=0)
+
+    return zip(lower_limits, upper_limits)
+
+
+def resampling_uncertainties(model, observations, method="bootstrap", samples_count=100, seed=0,
+                             processes_count=None, confidence_level=68.27):
+    """
+    Estimate confidence intervals of the model's parameters by refitting it to the resampled observations
+        :param model: DopplerOptimizationModel instance (fitted to the observations)
+        :param observations: ObservationsData instance
+        :param method: (str) "bootstrap" (residues) or "jackknife" (delete-d blocks)
+        :param samples_count: (int) number of bootstrap samples or jackknife blocks
+        :param seed: (int) seed of the bootstrap random generator
+        :param processes_count: (int) size of the processes pool (None means the number of CPUs)
+        :param confidence_level: (float) width of the interval in percents
+        :return: (tuple) list of the intervals and number of the successful refits
+    """
+    assert method in ("bootstrap", "jackknife"), "Unknown resampling method: %s" % method
+    assert samples_count > 1, "At least two samples are required"
+
+    if method == "bootstrap":
+        # Independent seeds of the samples drawn from the main seed
+        samples_seeds = numpy.random.RandomState(seed).randint(0, 2 ** 31 - 1, samples_count)
+        tasks = [(method, sample_id, sample_seed) for sample_id, sample_seed in enumerate(samples_seeds)]
+    else:
+        assert samples_count <= observations.count, \
+            "The number of jackknife blocks exceeds the number of observations (%i)" % observations.count
+        tasks = [(method, block_id, samples_count) for block_id in xrange(samples_count)]
+
+    jobs_pool = multiprocessing.Pool(processes_count, initializer=resampling_worker_initializer,
+                                     initargs=(model, observations))
+    try:
+        refitted_parameters = jobs_pool.map(resampling_worker, tasks, chunksize=1)
+    finally:
+        jobs_pool.close()
+        jobs_pool.join()
+
+    samples = numpy.array([parameters for parameters in refitted_parameters if parameters is not None])
+    assert len(samples) > 1, "Not enough successful refits to estimate the intervals"
+
+    return percentile_intervals(samples, method, confidence_level), len(samples)
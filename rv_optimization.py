@@ -17,8 +17,24 @@ def parse_command_line_arguments():
     parser.add_argument("--planets", type=int, required=True, dest="number_of_planets")
     parser.add_argument("--jitter", type=float, required=False, dest="stellar_jitter", default=0.0)
     parser.add_argument("--population-size", type=int, required=False, dest="population_size", default=3)
+    parser.add_argument("--chunk-size", type=int, required=False, dest="chunk_size", default=None)
+    parser.add_argument("--seed", type=int, required=False, dest="seed", default=None)
+    parser.add_argument("--checkpoint", type=str, required=False, dest="checkpoint_file", default=None)
+    parser.add_argument("--checkpoint-interval", type=int, required=False, dest="checkpoint_interval", default=10)
+    parser.add_argument("--resume", action="store_true", required=False, dest="resume", default=False)
 
-    return parser.parse_args()
+    args = parser.parse_args()
+
+    if args.observation_data_file.endswith(".npy") and args.stellar_jitter:
+        parser.error("--jitter is not supported for the binary (.npy) observations files")
+
+    if args.checkpoint_interval < 1:
+        parser.error("--checkpoint-interval must be a positive number of generations")
+
+    if args.resume and args.checkpoint_file is None:
+        parser.error("--resume requires --checkpoint")
+
+    return args
 
 
 def print_computation_summary(start_time, stop_time, de_quality, lm_quality, output_file):
@@ -45,7 +61,8 @@ def get_output_file_name(input_file_name, stellar_jitter, planets, quality):
 def main(args):
     print "* Reading observations..."
     observations = \
-        observations_data.ObservationsData.load_data(args.observation_data_file, jitter_value=args.stellar_jitter)
+        observations_data.ObservationsData.load_observations(args.observation_data_file, args.stellar_jitter,
+                                                             args.chunk_size)
 
     # Constant values
     number_of_planets = args.number_of_planets
@@ -54,8 +71,15 @@ def main(args):
 
     print "* Running evolutional optimization..."
     computation_start_time = datetime.now()
-    de_model = \
-        optimization.evolutional_optimization(number_of_planets, number_of_telescopes, observations, population_size)
+    try:
+        de_model = \
+            optimization.evolutional_optimization(number_of_planets, number_of_telescopes, observations,
+                                                  population_size, args.seed, args.checkpoint_file,
+                                                  args.checkpoint_interval, args.resume)
+    except KeyboardInterrupt:
+        if args.checkpoint_file:
+            print "* Optimization interrupted, continue it with: --checkpoint %s --resume" % args.checkpoint_file
+        raise
 
     print "* Running gradient optimization..."
     lm_model = \
@@ -72,8 +72,8 @@ def main(args):
 
     print "* Loading observations..."
     observations = \
-        observations_data.ObservationsData.load_data(doppler_model.observations_file,
-                                                     jitter_value=doppler_model.stellar_jitter)
+        observations_data.ObservationsData.load_observations(doppler_model.observations_file,
+                                                             jitter_value=doppler_model.stellar_jitter)
 
     # Observations time range
     min_limit, max_limit = rounddown(min(observations.julian_times), 100), roundup(max(observations.julian_times), 100)
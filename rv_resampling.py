@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2016 - Piotr Skonieczka
+#
+
+import argparse
+from datetime import datetime
+from dopplerlib import optimization
+from dopplerlib import observations_data
+from dopplerlib import resampling
+
+
+def parse_command_line_arguments():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--model", type=str, required=True, dest="model_file")
+    parser.add_argument("--method", type=str, required=False, dest="method", default="bootstrap",
+                        choices=["bootstrap", "jackknife"])
+    parser.add_argument("--samples", type=int, required=False, dest="samples_count", default=100)
+    parser.add_argument("--seed", type=int, required=False, dest="seed", default=0)
+    parser.add_argument("--processes", type=int, required=False, dest="processes_count", default=None)
+    parser.add_argument("--confidence-level", type=float, required=False, dest="confidence_level", default=68.27)
+
+    return parser.parse_args()
+
+
+def main(args):
+    print "* Loading model..."
+    doppler_model = optimization.DopplerOptimizationModel.read_model(args.model_file)
+
+    print "* Loading observations..."
+    observations = \
+        observations_data.ObservationsData.load_observations(doppler_model.observations_file,
+                                                             jitter_value=doppler_model.stellar_jitter)
+
+    print "* Running %s resampling..." % args.method
+    computation_start_time = datetime.now()
+    parameters_intervals, successful_refits = \
+        resampling.resampling_uncertainties(doppler_model, observations, args.method, args.samples_count, args.seed,
+                                            args.processes_count, args.confidence_level)
+    computation_end_time = datetime.now()
+
+    print "* Saving intervals to the model file..."
+    doppler_model.add_parameters_intervals(parameters_intervals, args.method)
+    optimization.DopplerOptimizationModel.save_model(args.model_file, doppler_model)
+
+    print "* Calculation summary:"
+    print "  Duration        : %s [H:M:S.ms]" % (computation_end_time - computation_start_time)
+    print "  Successful refits: %i / %i" % (successful_refits, args.samples_count)
+    print "  Resulting file  :", args.model_file
+
+
+if __name__ == "__main__":
+    main(args=parse_command_line_arguments())
@@ -48,6 +48,24 @@ def main(args):
             enumerate(zip(model.get_offsets(), model.get_offsets_uncersainties())):
         print "  T%i: %20.8f  (+/- %.8f)" % (telescope_id, offset_value, offset_uncersainty)
 
+    if model.parameters_intervals is not None:
+        print
+        print "* Confidence intervals (%s)" % model.resampling_method
+
+        for planet_id in xrange(model.number_of_planets):
+            print " ---------- P%i ---------- " % planet_id
+
+            for name, (lower_limit, upper_limit) in \
+                    zip(doppler_paramters_names, model.get_orbital_intervals(planet_id)):
+                print "%6s: [%.8f, %.8f]" % (name, lower_limit, upper_limit)
+
+        print
+        print "* Offsets of the telescopes"
+        print
+
+        for telescope_id, (lower_limit, upper_limit) in enumerate(model.get_offsets_intervals()):
+            print "  T%i: [%.8f, %.8f]" % (telescope_id, lower_limit, upper_limit)
+
 
 if __name__ == '__main__':
     main(args=parse_command_line_arguments())